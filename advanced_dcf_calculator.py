@@ -1,14 +1,29 @@
-import yfinance as yf
+import os
 import sys
+import time
+import pickle
+from dataclasses import dataclass
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
-import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
-from typing import Optional, Dict, Tuple
-from matplotlib.patches import Rectangle
+from typing import Optional, Dict, Tuple, Callable, Any, TYPE_CHECKING
 
-sns.set_style("whitegrid")
-plt.rcParams['figure.figsize'] = (12, 8)
+if TYPE_CHECKING:
+    import yfinance as yf
+
+try:
+    from numba import njit
+except ImportError:  # numba is optional; fall back to plain Python loops
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
+
+CACHE_DIR = '.dcf_cache'
+CACHE_TTL_SECONDS = 24 * 60 * 60
+
+_ticker_cache: Dict[str, 'yf.Ticker'] = {}
+_plot_setup_done = False
 
 
 def validate_positive_number(value: str, name: str) -> float:
@@ -86,56 +101,159 @@ def get_user_inputs() -> Dict:
     }
 
 
-def fetch_company_data(ticker: str) -> Optional[Dict]:
+@dataclass(frozen=True)
+class CompanyData:
+    """Company metrics from yfinance, with missing values resolved to defaults."""
+    company_name: str
+    beta: float = 1.0
+    market_cap: float = 0.0
+    shares_outstanding: float = 0.0
+    current_price: Optional[float] = None
+    ebit: float = 0.0
+    tax_expense: Optional[float] = None
+    depreciation: float = 0.0
+    interest_expense: float = 0.0
+    total_debt: float = 0.0
+    cash: float = 0.0
+    capex: float = 0.0
+    change_in_wc: float = 0.0
+
+
+def _has_payload(value: Any) -> bool:
+    """Default cache check: the lookup returned something non-empty."""
+    return value is not None and len(value) > 0
+
+
+def _has_company_fields(info: Dict) -> bool:
+    """A failed .info lookup still returns a few stray keys, so require identifying data."""
+    return info.get('longName') is not None or info.get('beta') is not None
+
+
+def _load_cached(ticker: str, name: str, loader: Callable[[], Any],
+                 is_valid: Callable[[Any], bool] = _has_payload) -> Any:
+    """Return a yfinance payload from the disk cache, calling loader when stale."""
+    path = os.path.join(CACHE_DIR, f"{ticker.replace(os.sep, '_')}_{name}.pkl")
+    
+    try:
+        if time.time() - os.path.getmtime(path) < CACHE_TTL_SECONDS:
+            with open(path, 'rb') as f:
+                return pickle.load(f)
+    except (OSError, EOFError, pickle.UnpicklingError):
+        pass
+    
+    value = loader()
+    
+    # Don't persist failed lookups, so the next run retries them
+    if _has_payload(value) and is_valid(value):
+        try:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            with open(path, 'wb') as f:
+                pickle.dump(value, f)
+        except (OSError, pickle.PicklingError):
+            pass
+    
+    return value
+
+
+def _get_ticker(ticker: str) -> 'yf.Ticker':
+    """Return a shared yf.Ticker so repeat lookups reuse its session and crumb."""
+    if ticker not in _ticker_cache:
+        import yfinance as yf
+        _ticker_cache[ticker] = yf.Ticker(ticker)
+    return _ticker_cache[ticker]
+
+
+def _fast_quote(ticker_obj, keys: Tuple[str, ...]) -> Dict:
+    """Read the requested quote fields from fast_info, skipping any that fail to load."""
+    fast_info = ticker_obj.fast_info
+    quote = {}
+    for key in keys:
+        # Each fast_info field is its own request; a failure just means the field is unavailable
+        try:
+            value = fast_info[key]
+        except Exception as e:
+            print(f"Warning: Could not read {key} from fast_info: {str(e)}")
+            continue
+        if value is not None:
+            quote[key] = value
+    return quote
+
+
+def fetch_company_data(ticker: str) -> Optional[CompanyData]:
     """Fetch company financial data from yfinance."""
     print(f"\nFetching data for {ticker}...")
     
     try:
-        ticker_obj = yf.Ticker(ticker)
+        ticker_obj = _get_ticker(ticker)
+        
+        # The four lookups are independent network requests, so issue them concurrently
+        attributes = ['info', 'financials', 'balance_sheet', 'cashflow']
+        validators = {'info': _has_company_fields}
+        with ThreadPoolExecutor(max_workers=len(attributes)) as executor:
+            futures = {
+                attr: executor.submit(_load_cached, ticker, attr, lambda attr=attr: getattr(ticker_obj, attr),
+                                      validators.get(attr, _has_payload))
+                for attr in attributes
+            }
+            payloads = {attr: future.result() for attr, future in futures.items()}
         
         # Fetch info
-        info = ticker_obj.info
+        info = payloads['info']
         beta = info.get('beta', None)
         market_cap = info.get('marketCap', None)
         shares_outstanding = info.get('sharesOutstanding', None)
         current_price = info.get('currentPrice', None)
         company_name = info.get('longName', ticker)
         
+        # fast_info has no beta or name, so it only fills quote fields .info left out
+        missing = tuple(key for key, value in (('market_cap', market_cap),
+                                               ('shares', shares_outstanding),
+                                               ('last_price', current_price)) if value is None)
+        if missing:
+            quote = _load_cached(ticker, 'fast_info_' + '_'.join(missing),
+                                 lambda: _fast_quote(ticker_obj, missing))
+            market_cap = market_cap if market_cap is not None else quote.get('market_cap')
+            shares_outstanding = shares_outstanding if shares_outstanding is not None else quote.get('shares')
+            current_price = current_price if current_price is not None else quote.get('last_price')
+        
         # Fetch financials
-        financials = ticker_obj.financials
+        financials = payloads['financials']
         if financials is None or financials.empty:
             print(f"Error: Could not fetch financials for {ticker}")
             return None
         
         most_recent_fiscal = financials.columns[0]
+        fin_series = financials[most_recent_fiscal].to_dict()
         
-        ebit = financials.loc['Operating Income', most_recent_fiscal] if 'Operating Income' in financials.index else None
-        tax_expense = financials.loc['Tax Provision', most_recent_fiscal] if 'Tax Provision' in financials.index else None
-        depreciation = financials.loc['Depreciation And Amortization', most_recent_fiscal] if 'Depreciation And Amortization' in financials.index else None
-        interest_expense = financials.loc['Interest Expense', most_recent_fiscal] if 'Interest Expense' in financials.index else None
+        ebit = fin_series.get('Operating Income')
+        tax_expense = fin_series.get('Tax Provision')
+        depreciation = fin_series.get('Depreciation And Amortization')
+        interest_expense = fin_series.get('Interest Expense')
         
         # Fetch balance sheet
-        balance_sheet = ticker_obj.balance_sheet
+        balance_sheet = payloads['balance_sheet']
         if balance_sheet is None or balance_sheet.empty:
             print(f"Error: Could not fetch balance sheet for {ticker}")
             return None
         
         most_recent_balance = balance_sheet.columns[0]
+        bs_series = balance_sheet[most_recent_balance].to_dict()
         
-        long_term_debt = balance_sheet.loc['Long Term Debt', most_recent_balance] if 'Long Term Debt' in balance_sheet.index else 0
-        short_term_debt = balance_sheet.loc['Short Term Borrowings', most_recent_balance] if 'Short Term Borrowings' in balance_sheet.index else 0
+        long_term_debt = bs_series.get('Long Term Debt', 0)
+        short_term_debt = bs_series.get('Short Term Borrowings', 0)
         total_debt = (long_term_debt if long_term_debt else 0) + (short_term_debt if short_term_debt else 0)
-        cash = balance_sheet.loc['Cash And Cash Equivalents', most_recent_balance] if 'Cash And Cash Equivalents' in balance_sheet.index else 0
+        cash = bs_series.get('Cash And Cash Equivalents', 0)
         
         # Fetch cash flow
-        cashflow = ticker_obj.cashflow
+        cashflow = payloads['cashflow']
         if cashflow is None or cashflow.empty:
             print(f"Error: Could not fetch cash flow for {ticker}")
             return None
         
         most_recent_cf = cashflow.columns[0]
+        cf_series = cashflow[most_recent_cf].to_dict()
         
-        capex = cashflow.loc['Capital Expenditure', most_recent_cf] if 'Capital Expenditure' in cashflow.index else 0
+        capex = cf_series.get('Capital Expenditure', 0)
         capex = abs(capex) if capex else 0
         
         change_in_wc = 0  # Simplified
@@ -154,27 +272,28 @@ def fetch_company_data(ticker: str) -> Optional[Dict]:
         
         print("Data fetched successfully!\n")
         
-        return {
-            'company_name': company_name,
-            'beta': beta,
-            'market_cap': market_cap,
-            'shares_outstanding': shares_outstanding,
-            'current_price': current_price,
-            'ebit': ebit,
-            'tax_expense': tax_expense,
-            'depreciation': depreciation,
-            'interest_expense': interest_expense,
-            'total_debt': total_debt,
-            'cash': cash,
-            'capex': capex,
-            'change_in_wc': change_in_wc
-        }
+        return CompanyData(
+            company_name=company_name,
+            beta=beta,
+            market_cap=market_cap,
+            shares_outstanding=shares_outstanding,
+            current_price=current_price,
+            ebit=ebit,
+            tax_expense=tax_expense,
+            depreciation=depreciation if depreciation else 0.0,
+            interest_expense=interest_expense if interest_expense else 0.0,
+            total_debt=total_debt,
+            cash=cash if cash else 0.0,
+            capex=capex,
+            change_in_wc=change_in_wc
+        )
     
     except Exception as e:
         print(f"Error fetching data for {ticker}: {str(e)}")
         return None
 
 
+@lru_cache(maxsize=4096)
 def calculate_tax_rate(ebit: float, tax_expense: Optional[float]) -> float:
     """Calculate effective tax rate."""
     if tax_expense is None or ebit <= 0:
@@ -184,6 +303,7 @@ def calculate_tax_rate(ebit: float, tax_expense: Optional[float]) -> float:
     return max(0, min(tax_rate, 0.5))
 
 
+@lru_cache(maxsize=4096)
 def calculate_cost_of_debt(total_debt: float, interest_expense: Optional[float], tax_rate: float) -> float:
     """Calculate after-tax cost of debt."""
     if total_debt == 0:
@@ -198,12 +318,14 @@ def calculate_cost_of_debt(total_debt: float, interest_expense: Optional[float],
     return after_tax_cost
 
 
+@lru_cache(maxsize=4096)
 def calculate_cost_of_equity(risk_free_rate: float, beta: float, equity_risk_premium: float) -> float:
     """Calculate cost of equity using CAPM."""
     cost_of_equity = risk_free_rate + (beta * equity_risk_premium)
     return cost_of_equity
 
 
+@lru_cache(maxsize=4096)
 def calculate_wacc(cost_of_equity: float, cost_of_debt: float, market_cap: float, total_debt: float) -> float:
     """Calculate Weighted Average Cost of Capital."""
     total_value = market_cap + total_debt
@@ -227,58 +349,84 @@ def calculate_fcff(ebit: float, tax_rate: float, depreciation: Optional[float],
     return fcff
 
 
-def forecast_fcff(base_fcff: float, forecast_years: int, short_term_growth: Optional[float] = None) -> list:
-    """Forecast FCFF for the forecast period."""
-    if short_term_growth is None:
-        short_term_growth = 0.05
+@njit(cache=True)
+def _dcf_core(base_fcff, short_term_growth, forecast_years, perpetual_growth,
+              wacc, total_debt, cash, shares_outstanding):
+    """Compiled single-pass forecast, discounting, terminal value and equity bridge."""
+    forecasted = np.empty(forecast_years)
+    pv_fcff = np.empty(forecast_years)
+    fcff = base_fcff
+    discount = 1.0
+    pv_fcff_total = 0.0
     
-    forecasted = []
-    for year in range(1, forecast_years + 1):
-        fcff = base_fcff * ((1 + short_term_growth) ** year)
-        forecasted.append(fcff)
+    for i in range(forecast_years):
+        fcff *= (1 + short_term_growth)
+        discount *= (1 + wacc)
+        forecasted[i] = fcff
+        pv_fcff[i] = fcff / discount
+        pv_fcff_total += pv_fcff[i]
     
-    return forecasted
-
-
-def calculate_terminal_value(fcff_final: float, perpetual_growth: float, wacc: float) -> float:
-    """Calculate terminal value using perpetuity growth model."""
     if wacc <= perpetual_growth:
-        print("Error: WACC must be greater than perpetual growth rate")
-        return 0
-    
-    terminal_value = (fcff_final * (1 + perpetual_growth)) / (wacc - perpetual_growth)
-    return terminal_value
-
-
-def calculate_enterprise_value(forecasted_fcff: list, terminal_value: float, wacc: float) -> Tuple[float, list, float]:
-    """Calculate enterprise value by discounting cash flows."""
-    pv_fcff_list = []
-    pv_fcff_total = 0
-    
-    for year, fcff in enumerate(forecasted_fcff, 1):
-        pv = fcff / ((1 + wacc) ** year)
-        pv_fcff_list.append(pv)
-        pv_fcff_total += pv
+        terminal_value = 0.0
+    else:
+        terminal_value = (fcff * (1 + perpetual_growth)) / (wacc - perpetual_growth)
+    pv_terminal = terminal_value / discount
     
-    pv_terminal = terminal_value / ((1 + wacc) ** len(forecasted_fcff))
     enterprise_value = pv_fcff_total + pv_terminal
-    
-    return enterprise_value, pv_fcff_list, pv_terminal
-
-
-def calculate_equity_value(enterprise_value: float, total_debt: float, cash: float) -> float:
-    """Calculate equity value from enterprise value."""
     equity_value = enterprise_value - total_debt + cash
-    return equity_value
-
-
-def calculate_intrinsic_value_per_share(equity_value: float, shares_outstanding: float) -> float:
-    """Calculate intrinsic value per share."""
-    if shares_outstanding == 0:
-        return 0
+    intrinsic_value = 0.0 if shares_outstanding == 0 else equity_value / shares_outstanding
+    
+    return forecasted, pv_fcff, terminal_value, pv_terminal, enterprise_value, equity_value, intrinsic_value
+
+
+@dataclass
+class DCFResult:
+    """Computed DCF outputs shared by the summary and the visualizations."""
+    tax_rate: float
+    cost_of_equity: float
+    cost_of_debt: float
+    wacc: float
+    base_fcff: float
+    forecasted_fcff: list
+    pv_fcff: list
+    terminal_value: float
+    pv_terminal: float
+    enterprise_value: float
+    equity_value: float
+    intrinsic_value: float
+
+
+def calculate_dcf(base_fcff: float, forecast_years: int, perpetual_growth: float,
+                  tax_rate: float, cost_of_equity: float, cost_of_debt: float, wacc: float,
+                  company_data: CompanyData, short_term_growth: Optional[float] = None) -> DCFResult:
+    """Run the full DCF (forecast, terminal value, EV, equity, per-share value) in one pass."""
+    if short_term_growth is None:
+        short_term_growth = 0.05
+    
+    if wacc <= perpetual_growth:
+        print("Error: WACC must be greater than perpetual growth rate")
     
-    intrinsic_value = equity_value / shares_outstanding
-    return intrinsic_value
+    (forecasted, pv_fcff, terminal_value, pv_terminal,
+     enterprise_value, equity_value, intrinsic_value) = _dcf_core(
+        float(base_fcff), float(short_term_growth), int(forecast_years), float(perpetual_growth),
+        float(wacc), float(company_data.total_debt), float(company_data.cash),
+        float(company_data.shares_outstanding)
+    )
+    
+    return DCFResult(
+        tax_rate=tax_rate,
+        cost_of_equity=cost_of_equity,
+        cost_of_debt=cost_of_debt,
+        wacc=wacc,
+        base_fcff=base_fcff,
+        forecasted_fcff=forecasted.tolist(),
+        pv_fcff=pv_fcff.tolist(),
+        terminal_value=terminal_value,
+        pv_terminal=pv_terminal,
+        enterprise_value=enterprise_value,
+        equity_value=equity_value,
+        intrinsic_value=intrinsic_value
+    )
 
 
 def format_currency(value: float) -> str:
@@ -291,37 +439,75 @@ def format_currency(value: float) -> str:
         return f"${value:,.2f}"
 
 
-def create_visualizations(ticker: str, inputs: Dict, company_data: Dict,
-                         cost_of_equity: float, cost_of_debt: float, wacc: float,
-                         base_fcff: float, forecasted_fcff: list, terminal_value: float,
-                         enterprise_value: float, equity_value: float, intrinsic_value: float,
-                         pv_fcff_list: list, pv_terminal: float):
+_CURRENCY_TIERS = np.array([1e6, 1e9])
+_CURRENCY_DIVISORS = np.array([1.0, 1e6, 1e9])
+_CURRENCY_SUFFIXES = ['', 'M', 'B']
+
+
+def _format_currency_vec(values) -> list:
+    """Format an array of values as currency, choosing each unit suffix in one pass."""
+    values = np.asarray(values, dtype=np.float64)
+    # np.digitize puts NaN in the top bin; format_currency falls through to the plain branch
+    tiers = np.where(np.isnan(values), 0, np.digitize(np.abs(values), _CURRENCY_TIERS))
+    scaled = values / _CURRENCY_DIVISORS[tiers]
+    return [f"${v:,.2f}" if t == 0 else f"${v:.2f}{_CURRENCY_SUFFIXES[t]}"
+            for v, t in zip(scaled.tolist(), tiers.tolist())]
+
+
+def _setup_plotting():
+    """Configure matplotlib and seaborn the first time a chart is drawn."""
+    global _plot_setup_done
+    if _plot_setup_done:
+        return
+    
+    import matplotlib
+    
+    # Headless runs (pipes, cron, batch valuation) don't need a GUI backend
+    if not sys.stdout.isatty():
+        matplotlib.use('Agg')
+    
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+    
+    sns.set_style("whitegrid")
+    plt.rcParams['figure.figsize'] = (12, 8)
+    _plot_setup_done = True
+
+
+def create_visualizations(ticker: str, inputs: Dict, company_data: CompanyData,
+                          result: DCFResult, show: bool = True):
     """Create comprehensive DCF visualizations."""
+    _setup_plotting()
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+    from matplotlib.patches import Rectangle
     
     fig = plt.figure(figsize=(20, 12))
-    company_name = company_data.get('company_name', ticker)
+    company_name = company_data.company_name
     
     # 1. Sensitivity Analysis Heatmap (WACC vs Perpetual Growth)
     ax1 = plt.subplot(2, 3, 1)
     
-    wacc_range = np.linspace(wacc * 0.8, wacc * 1.2, 7)
+    wacc_range = np.linspace(result.wacc * 0.8, result.wacc * 1.2, 7)
     growth_range = np.linspace(inputs['perpetual_growth'] * 0.5, 
-                               min(inputs['perpetual_growth'] * 1.5, wacc * 0.9), 7)
-    
-    sensitivity_matrix = np.zeros((len(wacc_range), len(growth_range)))
-    
-    for i, w in enumerate(wacc_range):
-        for j, g in enumerate(growth_range):
-            if w > g:
-                # Recalculate with new assumptions
-                tv_sens = (forecasted_fcff[-1] * (1 + g)) / (w - g)
-                pv_tv_sens = tv_sens / ((1 + w) ** len(forecasted_fcff))
-                pv_fcff_sens = sum([fcff / ((1 + w) ** (idx + 1)) for idx, fcff in enumerate(forecasted_fcff)])
-                ev_sens = pv_fcff_sens + pv_tv_sens
-                eq_val_sens = ev_sens - company_data['total_debt'] + company_data['cash']
-                sensitivity_matrix[i, j] = eq_val_sens / company_data['shares_outstanding']
-            else:
-                sensitivity_matrix[i, j] = np.nan
+                               min(inputs['perpetual_growth'] * 1.5, result.wacc * 0.9), 7)
+    
+    # Recalculate every (WACC, growth) cell at once: rows vary WACC, columns vary growth
+    fcff_arr = np.asarray(result.forecasted_fcff, dtype=np.float64)
+    W = wacc_range[:, None]
+    G = growth_range[None, :]
+
+    # Discounting only depends on WACC, so reduce over the years with one dot product per row
+    disc_years = np.cumprod(np.repeat(1 + W, len(fcff_arr), axis=1), axis=1)
+    pv_fcff_sens = np.dot(1.0 / disc_years, fcff_arr)[:, None]
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        tv_sens = np.where(W > G, fcff_arr[-1] * (1 + G) / (W - G), np.nan)
+    pv_tv_sens = tv_sens / disc_years[:, -1:]
+
+    ev_sens = pv_fcff_sens + pv_tv_sens
+    eq_val_sens = ev_sens - company_data.total_debt + company_data.cash
+    sensitivity_matrix = eq_val_sens / company_data.shares_outstanding
     
     sns.heatmap(sensitivity_matrix, 
                 xticklabels=[f"{g*100:.1f}%" for g in growth_range],
@@ -332,7 +518,7 @@ def create_visualizations(ticker: str, inputs: Dict, company_data: Dict,
     ax1.set_ylabel('WACC', fontweight='bold')
     
     # Mark current assumptions
-    current_wacc_idx = np.argmin(np.abs(wacc_range - wacc))
+    current_wacc_idx = np.argmin(np.abs(wacc_range - result.wacc))
     current_growth_idx = np.argmin(np.abs(growth_range - inputs['perpetual_growth']))
     ax1.add_patch(Rectangle((current_growth_idx, current_wacc_idx), 1, 1, 
                             fill=False, edgecolor='blue', lw=3))
@@ -341,32 +527,23 @@ def create_visualizations(ticker: str, inputs: Dict, company_data: Dict,
     ax2 = plt.subplot(2, 3, 2)
     
     categories = ['Enterprise\nValue', 'Less: Debt', 'Plus: Cash', 'Equity\nValue']
-    values = [enterprise_value, -company_data['total_debt'], company_data['cash'], equity_value]
+    values = [result.enterprise_value, -company_data.total_debt, company_data.cash, result.equity_value]
     
-    cumulative = [enterprise_value]
-    cumulative.append(cumulative[-1] - company_data['total_debt'])
-    cumulative.append(cumulative[-1] + company_data['cash'])
+    positions = np.arange(len(categories))
+    heights = np.asarray(values, dtype=np.float64)
+    cumulative = np.cumsum(heights[:-1])
+    bottoms = np.concatenate([[0], cumulative[:-1], [0]])
     
     colors = ['#2E86AB', '#A23B72', '#06A77D', '#F18F01']
     
     # Plot bars
-    ax2.bar(0, enterprise_value, color=colors[0], alpha=0.8, edgecolor='black')
-    ax2.bar(1, -company_data['total_debt'], bottom=cumulative[0], color=colors[1], alpha=0.8, edgecolor='black')
-    ax2.bar(2, company_data['cash'], bottom=cumulative[1], color=colors[2], alpha=0.8, edgecolor='black')
-    ax2.bar(3, equity_value, color=colors[3], alpha=0.8, edgecolor='black')
-    
-    for i in range(len(cumulative) - 1):
-        ax2.plot([i + 0.4, i + 0.6], [cumulative[i], cumulative[i]], 
-                'k--', linewidth=1, alpha=0.5)
-    
-    ax2.text(0, enterprise_value/2, format_currency(enterprise_value), 
-            ha='center', va='center', fontweight='bold', fontsize=9)
-    ax2.text(1, cumulative[0] - company_data['total_debt']/2, format_currency(-company_data['total_debt']), 
-            ha='center', va='center', fontweight='bold', fontsize=9)
-    ax2.text(2, cumulative[1] + company_data['cash']/2, format_currency(company_data['cash']), 
-            ha='center', va='center', fontweight='bold', fontsize=9)
-    ax2.text(3, equity_value/2, format_currency(equity_value), 
-            ha='center', va='center', fontweight='bold', fontsize=9)
+    ax2.bar(positions, heights, bottom=bottoms, color=colors, alpha=0.8, edgecolor='black')
+    ax2.hlines(cumulative[:-1], positions[:-2] + 0.4, positions[:-2] + 0.6,
+               colors='k', linestyles='--', linewidth=1, alpha=0.5)
+    
+    waterfall_labels = _format_currency_vec(heights)
+    for x, y, label in zip(positions, bottoms + heights / 2, waterfall_labels):
+        ax2.text(x, y, label, ha='center', va='center', fontweight='bold', fontsize=9)
     
     ax2.set_xticks(range(len(categories)))
     ax2.set_xticklabels(categories, fontweight='bold')
@@ -377,17 +554,13 @@ def create_visualizations(ticker: str, inputs: Dict, company_data: Dict,
     # 3. DCF Components Breakdown
     ax3 = plt.subplot(2, 3, 3)
     
-    years = [f"Year {i+1}" for i in range(len(pv_fcff_list))] + ['Terminal\nValue']
-    pv_values = pv_fcff_list + [pv_terminal]
+    years = [f"Year {i+1}" for i in range(len(result.pv_fcff))] + ['Terminal\nValue']
+    pv_values = result.pv_fcff + [result.pv_terminal]
     
-    bars = ax3.bar(years, pv_values, color=['#4A90E2' for _ in pv_fcff_list] + ['#E24A4A'], 
+    bars = ax3.bar(years, pv_values, color=['#4A90E2' for _ in result.pv_fcff] + ['#E24A4A'], 
                    alpha=0.8, edgecolor='black')
     
-    for bar, val in zip(bars, pv_values):
-        height = bar.get_height()
-        ax3.text(bar.get_x() + bar.get_width()/2., height,
-                f'{format_currency(val)}',
-                ha='center', va='bottom', fontsize=8, fontweight='bold')
+    ax3.bar_label(bars, labels=_format_currency_vec(pv_values), fontsize=8, fontweight='bold', padding=2)
     
     ax3.set_ylabel('Present Value ($)', fontweight='bold')
     ax3.set_title('DCF Components: PV of Cash Flows', fontweight='bold')
@@ -397,21 +570,17 @@ def create_visualizations(ticker: str, inputs: Dict, company_data: Dict,
     # 4. Price Comparison
     ax4 = plt.subplot(2, 3, 4)
     
-    if company_data['current_price']:
-        prices = [company_data['current_price'], intrinsic_value]
+    if company_data.current_price:
+        prices = [company_data.current_price, result.intrinsic_value]
         labels = ['Current\nMarket Price', 'DCF Intrinsic\nValue']
-        colors_price = ['#FF6B6B' if intrinsic_value > company_data['current_price'] else '#4ECDC4',
-                       '#4ECDC4' if intrinsic_value > company_data['current_price'] else '#FF6B6B']
+        colors_price = ['#FF6B6B' if result.intrinsic_value > company_data.current_price else '#4ECDC4',
+                       '#4ECDC4' if result.intrinsic_value > company_data.current_price else '#FF6B6B']
         
         bars = ax4.bar(labels, prices, color=colors_price, alpha=0.8, edgecolor='black', width=0.6)
         
-        for bar, price in zip(bars, prices):
-            height = bar.get_height()
-            ax4.text(bar.get_x() + bar.get_width()/2., height,
-                    f'${price:.2f}',
-                    ha='center', va='bottom', fontsize=12, fontweight='bold')
+        ax4.bar_label(bars, labels=[f'${price:.2f}' for price in prices], fontsize=12, fontweight='bold', padding=2)
         
-        upside = ((intrinsic_value - company_data['current_price']) / company_data['current_price']) * 100
+        upside = ((result.intrinsic_value - company_data.current_price) / company_data.current_price) * 100
         ax4.text(0.5, max(prices) * 0.5, f"Upside: {upside:+.1f}%", 
                 ha='center', fontsize=14, fontweight='bold',
                 bbox=dict(boxstyle='round', facecolor='yellow', alpha=0.7))
@@ -423,11 +592,11 @@ def create_visualizations(ticker: str, inputs: Dict, company_data: Dict,
     # 5. WACC Breakdown
     ax5 = plt.subplot(2, 3, 5)
     
-    total_value = company_data['market_cap'] + company_data['total_debt']
-    weight_equity = company_data['market_cap'] / total_value
-    weight_debt = company_data['total_debt'] / total_value
+    total_value = company_data.market_cap + company_data.total_debt
+    weight_equity = company_data.market_cap / total_value
+    weight_debt = company_data.total_debt / total_value
     
-    wacc_components = [weight_equity * cost_of_equity, weight_debt * cost_of_debt]
+    wacc_components = [weight_equity * result.cost_of_equity, weight_debt * result.cost_of_debt]
     labels_wacc = [f'Cost of Equity\n({weight_equity*100:.1f}% weight)', 
                    f'Cost of Debt\n({weight_debt*100:.1f}% weight)']
     colors_wacc = ['#3498DB', '#E74C3C']
@@ -435,18 +604,19 @@ def create_visualizations(ticker: str, inputs: Dict, company_data: Dict,
     wedges, texts, autotexts = ax5.pie(wacc_components, labels=labels_wacc, autopct='%1.2f%%',
                                         colors=colors_wacc, startangle=90, textprops={'fontweight': 'bold'})
     
-    ax5.set_title(f'WACC Breakdown\nTotal WACC: {wacc*100:.2f}%', fontweight='bold')
+    ax5.set_title(f'WACC Breakdown\nTotal WACC: {result.wacc*100:.2f}%', fontweight='bold')
     
     # 6. Cash Flow Forecast
     ax6 = plt.subplot(2, 3, 6)
     
-    years_fcff = list(range(1, len(forecasted_fcff) + 1))
-    ax6.plot(years_fcff, forecasted_fcff, marker='o', linewidth=2, markersize=8, 
+    years_fcff = list(range(1, len(result.forecasted_fcff) + 1))
+    ax6.plot(years_fcff, result.forecasted_fcff, marker='o', linewidth=2, markersize=8, 
             color='#2ECC71', label='Forecasted FCFF')
-    ax6.axhline(y=base_fcff, color='#E67E22', linestyle='--', linewidth=2, label='Base Year FCFF')
+    ax6.axhline(y=result.base_fcff, color='#E67E22', linestyle='--', linewidth=2, label='Base Year FCFF')
     
-    for x, y in zip(years_fcff, forecasted_fcff):
-        ax6.text(x, y, format_currency(y), ha='center', va='bottom', fontsize=8, fontweight='bold')
+    fcff_labels = _format_currency_vec(result.forecasted_fcff)
+    for x, y, label in zip(years_fcff, result.forecasted_fcff, fcff_labels):
+        ax6.text(x, y, label, ha='center', va='bottom', fontsize=8, fontweight='bold')
     
     ax6.set_xlabel('Forecast Year', fontweight='bold')
     ax6.set_ylabel('FCFF ($)', fontweight='bold')
@@ -462,21 +632,19 @@ def create_visualizations(ticker: str, inputs: Dict, company_data: Dict,
     plt.savefig(filename, dpi=300, bbox_inches='tight')
     print(f"\n✓ Visualizations saved as: {filename}")
     
-    plt.show()
+    if show:
+        plt.show()
+    plt.close(fig)
 
 
-def print_summary(ticker: str, inputs: Dict, company_data: Dict, 
-                  cost_of_equity: float, cost_of_debt: float, wacc: float,
-                  base_fcff: float, forecasted_fcff: list, terminal_value: float,
-                  enterprise_value: float, equity_value: float, intrinsic_value: float,
-                  tax_rate: float):
+def print_summary(ticker: str, inputs: Dict, company_data: CompanyData, result: DCFResult):
     """Print comprehensive DCF analysis summary."""
     print("\n" + "="*60)
     print("DCF VALUATION SUMMARY")
     print("="*60)
     
-    print(f"\n--- Ticker: {ticker} ({company_data.get('company_name', 'N/A')}) ---")
-    print(f"Current Stock Price: ${company_data['current_price']:.2f}" if company_data['current_price'] else "N/A")
+    print(f"\n--- Ticker: {ticker} ({company_data.company_name}) ---")
+    print(f"Current Stock Price: ${company_data.current_price:.2f}" if company_data.current_price else "N/A")
     
     print(f"\n--- Input Parameters ---")
     print(f"Risk-Free Rate: {inputs['risk_free_rate']*100:.2f}%")
@@ -485,36 +653,36 @@ def print_summary(ticker: str, inputs: Dict, company_data: Dict,
     print(f"Perpetual Growth Rate: {inputs['perpetual_growth']*100:.2f}%")
     
     print(f"\n--- Company Metrics ---")
-    print(f"Beta: {company_data['beta']:.2f}")
-    print(f"Market Cap: {format_currency(company_data['market_cap'])}")
-    print(f"Total Debt: {format_currency(company_data['total_debt'])}")
-    print(f"Cash: {format_currency(company_data['cash'])}")
-    print(f"Tax Rate: {tax_rate*100:.2f}%")
+    print(f"Beta: {company_data.beta:.2f}")
+    print(f"Market Cap: {format_currency(company_data.market_cap)}")
+    print(f"Total Debt: {format_currency(company_data.total_debt)}")
+    print(f"Cash: {format_currency(company_data.cash)}")
+    print(f"Tax Rate: {result.tax_rate*100:.2f}%")
     
     print(f"\n--- WACC Calculation ---")
-    print(f"Cost of Equity (CAPM): {cost_of_equity*100:.2f}%")
-    print(f"Cost of Debt (after-tax): {cost_of_debt*100:.2f}%")
-    print(f"WACC: {wacc*100:.2f}%")
+    print(f"Cost of Equity (CAPM): {result.cost_of_equity*100:.2f}%")
+    print(f"Cost of Debt (after-tax): {result.cost_of_debt*100:.2f}%")
+    print(f"WACC: {result.wacc*100:.2f}%")
     
     print(f"\n--- Free Cash Flow Analysis ---")
-    print(f"EBIT: {format_currency(company_data['ebit'])}")
-    print(f"Base Year FCFF: {format_currency(base_fcff)}")
+    print(f"EBIT: {format_currency(company_data.ebit)}")
+    print(f"Base Year FCFF: {format_currency(result.base_fcff)}")
     print(f"Forecasted FCFF (Year 1-{inputs['forecast_years']}):")
-    for i, fcff in enumerate(forecasted_fcff, 1):
+    for i, fcff in enumerate(result.forecasted_fcff, 1):
         print(f"  Year {i}: {format_currency(fcff)}")
     
     print(f"\n--- Valuation ---")
-    print(f"Terminal Value: {format_currency(terminal_value)}")
-    print(f"Enterprise Value: {format_currency(enterprise_value)}")
-    print(f"Less: Total Debt: {format_currency(company_data['total_debt'])}")
-    print(f"Plus: Cash: {format_currency(company_data['cash'])}")
-    print(f"Equity Value: {format_currency(equity_value)}")
-    print(f"\nShares Outstanding: {company_data['shares_outstanding']:,.0f}")
-    print(f"\n*** INTRINSIC VALUE PER SHARE: ${intrinsic_value:.2f} ***")
-    
-    if company_data['current_price']:
-        upside_downside = ((intrinsic_value - company_data['current_price']) / company_data['current_price']) * 100
-        print(f"\nCurrent Price: ${company_data['current_price']:.2f}")
+    print(f"Terminal Value: {format_currency(result.terminal_value)}")
+    print(f"Enterprise Value: {format_currency(result.enterprise_value)}")
+    print(f"Less: Total Debt: {format_currency(company_data.total_debt)}")
+    print(f"Plus: Cash: {format_currency(company_data.cash)}")
+    print(f"Equity Value: {format_currency(result.equity_value)}")
+    print(f"\nShares Outstanding: {company_data.shares_outstanding:,.0f}")
+    print(f"\n*** INTRINSIC VALUE PER SHARE: ${result.intrinsic_value:.2f} ***")
+    
+    if company_data.current_price:
+        upside_downside = ((result.intrinsic_value - company_data.current_price) / company_data.current_price) * 100
+        print(f"\nCurrent Price: ${company_data.current_price:.2f}")
         print(f"Upside/Downside: {upside_downside:+.2f}%")
         
         if upside_downside > 20:
@@ -543,106 +711,56 @@ def main():
         sys.exit(1)
     
     # Calculate tax rate
-    tax_rate = calculate_tax_rate(company_data['ebit'], company_data['tax_expense'])
+    tax_rate = calculate_tax_rate(company_data.ebit, company_data.tax_expense)
     
     # Calculate WACC components
     cost_of_equity = calculate_cost_of_equity(
         inputs['risk_free_rate'],
-        company_data['beta'],
+        company_data.beta,
         inputs['equity_risk_premium']
     )
     
     cost_of_debt = calculate_cost_of_debt(
-        company_data['total_debt'],
-        company_data['interest_expense'],
+        company_data.total_debt,
+        company_data.interest_expense,
         tax_rate
     )
     
     wacc = calculate_wacc(
         cost_of_equity,
         cost_of_debt,
-        company_data['market_cap'],
-        company_data['total_debt']
+        company_data.market_cap,
+        company_data.total_debt
     )
     
     # Calculate base FCFF
     base_fcff = calculate_fcff(
-        company_data['ebit'],
+        company_data.ebit,
         tax_rate,
-        company_data['depreciation'],
-        company_data['capex'],
-        company_data['change_in_wc']
+        company_data.depreciation,
+        company_data.capex,
+        company_data.change_in_wc
     )
     
-    # Forecast FCFF
-    forecasted_fcff = forecast_fcff(
+    # Forecast FCFF, discount it and bridge to intrinsic value per share
+    result = calculate_dcf(
         base_fcff,
         inputs['forecast_years'],
-        inputs['short_term_growth']
-    )
-    
-    # Calculate terminal value
-    terminal_value = calculate_terminal_value(
-        forecasted_fcff[-1],
         inputs['perpetual_growth'],
-        wacc
-    )
-    
-    # Calculate enterprise value
-    enterprise_value, pv_fcff_list, pv_terminal = calculate_enterprise_value(
-        forecasted_fcff,
-        terminal_value,
-        wacc
-    )
-    
-    # Calculate equity value
-    equity_value = calculate_equity_value(
-        enterprise_value,
-        company_data['total_debt'],
-        company_data['cash']
-    )
-    
-    # Calculate intrinsic value per share
-    intrinsic_value = calculate_intrinsic_value_per_share(
-        equity_value,
-        company_data['shares_outstanding']
+        tax_rate=tax_rate,
+        cost_of_equity=cost_of_equity,
+        cost_of_debt=cost_of_debt,
+        wacc=wacc,
+        company_data=company_data,
+        short_term_growth=inputs['short_term_growth']
     )
     
     # Print summary
-    print_summary(
-        inputs['ticker'],
-        inputs,
-        company_data,
-        cost_of_equity,
-        cost_of_debt,
-        wacc,
-        base_fcff,
-        forecasted_fcff,
-        terminal_value,
-        enterprise_value,
-        equity_value,
-        intrinsic_value,
-        tax_rate
-    )
+    print_summary(inputs['ticker'], inputs, company_data, result)
     
     # Create visualizations
     print("\nGenerating visualizations...")
-    create_visualizations(
-        inputs['ticker'],
-        inputs,
-        company_data,
-        cost_of_equity,
-        cost_of_debt,
-        wacc,
-        base_fcff,
-        forecasted_fcff,
-        terminal_value,
-        enterprise_value,
-        equity_value,
-        intrinsic_value,
-        pv_fcff_list,
-        pv_terminal
-    )
+    create_visualizations(inputs['ticker'], inputs, company_data, result, show=sys.stdout.isatty())
 
 
 if __name__ == "__main__":